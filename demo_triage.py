@@ -7,23 +7,37 @@ from src.triage import triage_incident
 
 
 import json
+import os
 from pathlib import Path
 
 from src.triage import triage_incident
 
+try:
+    import orjson  # optional, faster JSON encoder
+except ImportError:
+    orjson = None
+
 
 EXAMPLES_DIR = Path(__file__).parent / "examples" / "incidents"
 
 
 def _print_ticket(ticket: dict) -> None:
     print("\n--- TRIAGE OUTPUT ---")
-    print(json.dumps(ticket, indent=2))
+    if orjson is not None:
+        print(orjson.dumps(ticket, option=orjson.OPT_INDENT_2).decode())
+    else:
+        print(json.dumps(ticket, indent=2))
 
 
 def _load_example_files() -> list[Path]:
+    # Called once from main(); the menu loop reuses the list.
+    # DirEntry.is_file() uses the type from readdir, no extra stat per file
     if not EXAMPLES_DIR.exists():
         return []
-    return sorted([p for p in EXAMPLES_DIR.iterdir() if p.is_file() and p.suffix in {".txt", ".md"}])
+    with os.scandir(EXAMPLES_DIR) as it:
+        entries = [e for e in it if e.is_file() and e.name.endswith((".txt", ".md"))]
+    entries.sort(key=lambda e: e.name)
+    return [Path(e.path) for e in entries]
 
 
 def _choose_example(files: list[Path]) -> str | None:
@@ -10,9 +10,12 @@ Purpose:
 
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict, field
-from datetime import datetime, timezone
-from typing import Dict, List, Tuple, Any
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from typing import Dict, Iterable, List, Optional, Tuple, Any
 from enum import Enum
 
 
@@ -30,8 +33,15 @@ class Urgency(str, Enum):
     UNKNOWN = "Unknown"
 
 
+# Plain-str values for hot-path comparisons: tickets still carry the enum
+# members, but comparing against these skips the enum class attribute lookup
+_CAT_GENERAL_OPS = Category.GENERAL_OPS.value
+_URG_HIGH = Urgency.HIGH.value
+
+
 @dataclass
 class IncidentTicket:
+    """Schema of a triaged ticket; triage_incident returns the same fields as a dict."""
     ticket_id: str
     created_at_utc: str
     title: str
@@ -60,83 +70,141 @@ class IncidentTicket:
     citations: List[Dict[str, str]] = field(default_factory=list)  # {"doc_id": "...", "chunk_id":"...", "quote":"..."}
 
 
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") of the last timestamp, swapped as one tuple
+_utc_second: Tuple[int, str] = (-1, "")
+
+
 def _utc_now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    # Like datetime.now(timezone.utc).isoformat(), except the microsecond
+    # fraction is always emitted (isoformat() drops it when it is 0);
+    # strftime only runs once per wall-clock second
+    global _utc_second
+    secs, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_secs, prefix = _utc_second
+    if secs != cached_secs:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(secs))
+        _utc_second = (secs, prefix)
+    return f"{prefix}.{micros:06d}+00:00"
 
 
 def _simple_ticket_id(text: str) -> str:
-    # Deterministic-ish ID for demo purposes (not production)
-    base = abs(hash(text)) % 10**8
+    # Deterministic ID for demo purposes (not production). CRC-32 rather than
+    # hash(), which is salted per process, so the same text gets the same ID
+    # across runs
+    base = zlib.crc32(text.encode("utf-8")) % 10**8
     return f"INC-{base:08d}"
 
 def _normalize(text: str) -> str:
     return (text or "").strip()
 
-def _contains_any(text: str, keywords: List[str]) -> List[str]:
-    t = text.lower()
-    return [k for k in keywords if k in t]
+def _check_lowercase(*tables: Tuple[str, ...]) -> None:
+    # Scans run against lowercased text, so an uppercase keyword would never
+    # match. Called at import on every keyword table, so fail loudly
+    not_lower = [k for table in tables for k in table if k != k.lower()]
+    if not_lower:
+        raise ValueError(f"keywords must be lowercase: {not_lower}")
+
 
-CATEGORY_RULES: List[Tuple[Category, List[str], List[str]]] = [
+def _scan(text_lower: str, keywords: Tuple[str, ...]) -> List[str]:
+    """
+    Return the keywords found in `text_lower` (already lowercased), in
+    keyword order. Substring semantics: "auth" matches "authentication".
+    """
+    # Per-keyword str.__contains__ (C fastsearch) beats a regex alternation
+    # or an Aho-Corasick automaton for lists this short, at any text length
+    return [k for k in keywords if k in text_lower]
+
+CATEGORY_RULES: Tuple[Tuple[Category, Tuple[str, ...], Tuple[str, ...]], ...] = (
     # (category, keywords, suspected_systems)
-    (Category.IT_OPS, ["login", "auth", "authentication", "sso", "password", "token", "vpn", "dns"], ["Authentication"]),
-    (Category.CUSTOMER_SUPPORT, ["payment", "checkout", "refund", "charge", "billing", "invoice"], ["Payments/Billing"]),
-    (Category.OPERATIONS, ["shipment", "delivery", "warehouse", "route", "fleet", "dispatch"], ["Logistics"]),
-    (Category.ENGINEERING, ["build failed", "ci", "pipeline", "deploy", "release", "bug", "rollback"], ["CI/CD"]),
-]
+    (Category.IT_OPS, ("login", "auth", "authentication", "sso", "password", "token", "vpn", "dns"), ("Authentication",)),
+    (Category.CUSTOMER_SUPPORT, ("payment", "checkout", "refund", "charge", "billing", "invoice"), ("Payments/Billing",)),
+    (Category.OPERATIONS, ("shipment", "delivery", "warehouse", "route", "fleet", "dispatch"), ("Logistics",)),
+    (Category.ENGINEERING, ("build failed", "ci", "pipeline", "deploy", "release", "bug", "rollback"), ("CI/CD",)),
+)
+
+URGENCY_HIGH = ("outage", "down", "unable", "cannot", "can't", "sev1", "critical", "p0", "blocker")
+URGENCY_MED = ("slow", "intermittent", "sometimes", "degraded", "latency", "flaky")
+
+IMPACT_BROAD = ("multiple teams", "all users", "everyone", "company-wide", "entire org")
+IMPACT_CUSTOMER = ("customer", "customers", "clients", "buyers", "users affected")
 
-URGENCY_HIGH = ["outage", "down", "unable", "cannot", "can't", "sev1", "critical", "p0", "blocker"]
-URGENCY_MED = ["slow", "intermittent", "sometimes", "degraded", "latency", "flaky"]
+MISSING_TIME = ("started", "since", "minutes", "hours", "today", "yesterday", "timestamp", "am", "pm")
+MISSING_ERROR = ("error", "message", "code", "screenshot", "log", "stacktrace", "trace")
+MISSING_SCOPE = ("affects", "impact", "users", "teams", "customers", "everyone", "all users")
+MISSING_ENV = ("prod", "production", "staging", "dev", "test environment")
 
-IMPACT_BROAD = ["multiple teams", "all users", "everyone", "company-wide", "entire org"]
-IMPACT_CUSTOMER = ["customer", "customers", "clients", "buyers", "users affected"]
+# CATEGORY_RULES split into parallel, single-typed tuples for the hot loop.
+# Keywords stay ordered (not frozensets) so matched_keywords is deterministic
+CATEGORY_NAMES: Tuple[Category, ...] = tuple(cat for cat, _, _ in CATEGORY_RULES)
+CATEGORY_KEYWORDS: Tuple[Tuple[str, ...], ...] = tuple(kws for _, kws, _ in CATEGORY_RULES)
+CATEGORY_SUSPECTED: Tuple[Tuple[str, ...], ...] = tuple(suspected for _, _, suspected in CATEGORY_RULES)
+
+# The four missing-info lists are scanned together in one pass
+MISSING_INFO_KEYWORDS = tuple(dict.fromkeys(MISSING_TIME + MISSING_ERROR + MISSING_SCOPE + MISSING_ENV))
+
+_check_lowercase(
+    *CATEGORY_KEYWORDS, URGENCY_HIGH, URGENCY_MED, IMPACT_BROAD, IMPACT_CUSTOMER,
+    MISSING_TIME, MISSING_ERROR, MISSING_SCOPE, MISSING_ENV,
+)
 
 
 # Actions are centralized (less spaghetti)
-ACTION_PLAYBOOK: Dict[Category, List[str]] = {
-    Category.IT_OPS: [
+ACTION_PLAYBOOK: Dict[Category, Tuple[str, ...]] = {
+    Category.IT_OPS: (
         "Check service health dashboards and recent changes/deploys",
         "Collect an error message/code and a timestamp of a failing attempt",
         "Identify affected scope (which users/teams, which region, which environment)",
-    ],
-    Category.CUSTOMER_SUPPORT: [
+    ),
+    Category.CUSTOMER_SUPPORT: (
         "Confirm scope (which customers, region, account tier) and collect examples",
         "Collect IDs (order/transaction/customer) and timestamps for failures",
         "Check third-party provider status pages if applicable",
-    ],
-    Category.OPERATIONS: [
+    ),
+    Category.OPERATIONS: (
         "Confirm affected locations/routes and time window",
         "Collect relevant IDs (shipment/order/vehicle) and current status",
         "Check upstream dependencies (vendors, inventory, dispatch systems)",
-    ],
-    Category.ENGINEERING: [
+    ),
+    Category.ENGINEERING: (
         "Identify failing step and capture logs/error output",
         "Check recent changes (PRs, releases) and rollback options",
         "Confirm environment (prod/stage), version, and reproduction steps",
-    ],
-    Category.GENERAL_OPS: [
+    ),
+    Category.GENERAL_OPS: (
         "Clarify the goal and success criteria",
         "Identify owner/team responsible",
         "Collect relevant IDs, timestamps, and any error details",
-    ],
+    ),
 }
 
+# RAG hooks: suggest runbook types (IDs/names), but don't invent content.
+# General Ops has none
+RUNBOOKS: Dict[Category, Tuple[str, ...]] = {
+    Category.IT_OPS: ("RBK-IT-AUTH-001", "RBK-IT-SSO-002"),
+    Category.CUSTOMER_SUPPORT: ("RBK-CS-PAYMENTS-010",),
+    Category.ENGINEERING: ("RBK-ENG-CICD-101",),
+    Category.OPERATIONS: ("RBK-OPS-LOGISTICS-050",),
+}
 
-def _classify_category(raw: str) -> Tuple[Category, List[str], List[str], float, List[str]]:
+
+def _classify_category(
+    raw_lower: str, reasoning_out: List[str], matched_out: Dict[str, List[str]]
+) -> Tuple[Category, Tuple[str, ...], float]:
     """
-    Returns: (category, matched_keywords, suspected_systems, confidence, reasoning_lines)
+    Returns: (category, suspected_systems, confidence)
+    Writes matched_out["category"] and appends its reasoning line to reasoning_out.
     Conservative: if weak evidence, return GENERAL_OPS with lower confidence.
     """
     best_category = Category.GENERAL_OPS
     best_matches: List[str] = []
-    best_suspected: List[str] = []
-    reasoning: List[str] = []
+    best_suspected: Tuple[str, ...] = ()
 
-    for cat, keywords, suspected in CATEGORY_RULES:
-        matches = _contains_any(raw, keywords)
+    for i in range(len(CATEGORY_NAMES)):
+        matches = _scan(raw_lower, CATEGORY_KEYWORDS[i])
         if len(matches) > len(best_matches):
-            best_category = cat
+            best_category = CATEGORY_NAMES[i]
             best_matches = matches
-            best_suspected = suspected
+            best_suspected = CATEGORY_SUSPECTED[i]
 
     # Simple confidence heuristic: more matches => higher confidence
     if len(best_matches) >= 3:
@@ -148,62 +216,74 @@ def _classify_category(raw: str) -> Tuple[Category, List[str], List[str], float,
     else:
         conf = 0.40  # general/unknown
 
-    if best_category == Category.GENERAL_OPS:
-        reasoning.append("No strong category keywords matched; defaulted to General Ops.")
+    if best_category == _CAT_GENERAL_OPS:
+        reasoning_out.append("No strong category keywords matched; defaulted to General Ops.")
     else:
-        reasoning.append(f"Category inferred from keywords: {best_matches}.")
+        reasoning_out.append(f"Category inferred from keywords: {best_matches}.")
 
-    return best_category, best_matches, best_suspected, conf, reasoning
+    matched_out["category"] = best_matches
+    return best_category, best_suspected, conf
 
 
-def _classify_urgency(raw: str) -> Tuple[Urgency, List[str], float, List[str]]:
-    matched_high = _contains_any(raw, URGENCY_HIGH)
-    matched_med = _contains_any(raw, URGENCY_MED)
-
-    reasoning: List[str] = []
+def _classify_urgency(
+    raw_lower: str, reasoning_out: List[str], matched_out: Dict[str, List[str]]
+) -> Tuple[Urgency, float]:
+    matched_high = _scan(raw_lower, URGENCY_HIGH)
+    matched_med = _scan(raw_lower, URGENCY_MED)
 
     # Prefer high if any high indicators
     if matched_high:
-        reasoning.append(f"Urgency set to High due to indicators: {matched_high}.")
-        return Urgency.HIGH, matched_high, 0.80, reasoning
+        reasoning_out.append(f"Urgency set to High due to indicators: {matched_high}.")
+        matched_out["urgency"] = matched_high
+        return Urgency.HIGH, 0.80
 
     if matched_med:
-        reasoning.append(f"Urgency set to Medium due to indicators: {matched_med}.")
-        return Urgency.MEDIUM, matched_med, 0.65, reasoning
+        reasoning_out.append(f"Urgency set to Medium due to indicators: {matched_med}.")
+        matched_out["urgency"] = matched_med
+        return Urgency.MEDIUM, 0.65
 
     # If no indicators, be conservative but not alarmist
-    reasoning.append("No urgency indicators found; set to Low.")
-    return Urgency.LOW, [], 0.55, reasoning
-
+    reasoning_out.append("No urgency indicators found; set to Low.")
+    matched_out["urgency"] = []
+    return Urgency.LOW, 0.55
 
-def _infer_impact(raw: str) -> Tuple[str, List[str], List[str]]:
-    broad = _contains_any(raw, IMPACT_BROAD)
-    customer = _contains_any(raw, IMPACT_CUSTOMER)
 
+def _infer_impact(raw_lower: str, reasoning_out: List[str], matched_out: Dict[str, List[str]]) -> str:
+    # matched_out["impact"] is only set when something matched
+    broad = _scan(raw_lower, IMPACT_BROAD)
     if broad:
-        return "Broad impact (many users/teams)", broad, ["Impact inferred as broad due to keywords."]
+        reasoning_out.append("Impact inferred as broad due to keywords.")
+        matched_out["impact"] = broad
+        return "Broad impact (many users/teams)"
+
+    customer = _scan(raw_lower, IMPACT_CUSTOMER)
     if customer:
-        return "Customer-facing impact", customer, ["Impact inferred as customer-facing due to keywords."]
-    return "Unknown/unclear impact", [], ["Impact not clearly specified; left as unknown."]
+        reasoning_out.append("Impact inferred as customer-facing due to keywords.")
+        matched_out["impact"] = customer
+        return "Customer-facing impact"
+
+    reasoning_out.append("Impact not clearly specified; left as unknown.")
+    return "Unknown/unclear impact"
 
 
-def _missing_info_questions(raw: str) -> List[str]:
+def _missing_info_questions(raw_lower: str) -> List[str]:
     questions = []
+    found = set(_scan(raw_lower, MISSING_INFO_KEYWORDS))
 
     # Time window / start time
-    if not _contains_any(raw, ["started", "since", "minutes", "hours", "today", "yesterday", "timestamp", "am", "pm"]):
+    if found.isdisjoint(MISSING_TIME):
         questions.append("When did this start (approx. time and timezone)?")
 
     # Error details
-    if not _contains_any(raw, ["error", "message", "code", "screenshot", "log", "stacktrace", "trace"]):
+    if found.isdisjoint(MISSING_ERROR):
         questions.append("Do you have an error message, code, or log snippet?")
 
     # Scope
-    if not _contains_any(raw, ["affects", "impact", "users", "teams", "customers", "everyone", "all users"]):
+    if found.isdisjoint(MISSING_SCOPE):
         questions.append("Who is affected (team/customers/how many users)?")
 
     # Environment (often missing and critical)
-    if not _contains_any(raw, ["prod", "production", "staging", "dev", "test environment"]):
+    if found.isdisjoint(MISSING_ENV):
         questions.append("Which environment is affected (prod/staging/dev)?")
 
     return questions
@@ -213,79 +293,121 @@ def triage_incident(text: str) -> Dict[str, Any]:
     Convert raw incident text into a structured ticket.
     Deterministic + conservative by design.
     """
+    return _triage(text, _utc_now_iso())
+
+
+def triage_incidents(texts: Iterable[str], max_workers: Optional[int] = 1) -> List[Dict[str, Any]]:
+    """
+    Triage a batch of incidents; tickets come back in input order and share
+    one created_at_utc. Raises ValueError if any text is empty.
+
+    max_workers > 1 (or None for os.cpu_count()) spreads the batch over a
+    process pool, which only pays off for large batches.
+    """
+    created_at_utc = _utc_now_iso()
+    worker = partial(_triage, created_at_utc=created_at_utc)
+
+    if max_workers == 1:
+        return [worker(text) for text in texts]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(worker, texts, chunksize=64))
+
+
+# Duplicate incidents (re-submitted templates, retried monitor alerts) skip
+# the keyword work. Those texts are short, so only bodies up to 1K chars are
+# cached: worst case 4096 x 1K = ~4M chars of descriptions (the key and the
+# "description" value are the same string), i.e. up to ~16 MB for non-Latin-1
+# text, plus a few KB of ticket fields per entry
+_CACHE_MAX_CHARS = 1024
+
+
+def _triage(text: str, created_at_utc: str) -> Dict[str, Any]:
     raw = _normalize(text)
     if not raw:
         raise ValueError("incident text is required")
 
-    title = raw.splitlines()[0][:80] if raw else "Untitled incident"
+    if len(raw) > _CACHE_MAX_CHARS:
+        ticket = _build_ticket(raw)
+    else:
+        ticket = _copy_ticket(_build_ticket_cached(raw))
+    ticket["created_at_utc"] = created_at_utc
+    return ticket
+
+
+def _copy_ticket(ticket: Dict[str, Any]) -> Dict[str, Any]:
+    # Cached tickets are shared between calls: copy every mutable field so
+    # callers can't change what the next duplicate gets
+    copied = dict(ticket)
+    copied["suspected_systems"] = list(ticket["suspected_systems"])
+    copied["matched_keywords"] = {k: list(v) for k, v in ticket["matched_keywords"].items()}
+    copied["reasoning"] = list(ticket["reasoning"])
+    copied["missing_info_questions"] = list(ticket["missing_info_questions"])
+    copied["next_actions"] = list(ticket["next_actions"])
+    copied["recommended_runbooks"] = list(ticket["recommended_runbooks"])
+    copied["citations"] = list(ticket["citations"])
+    return copied
+
+
+def _build_ticket(raw: str) -> Dict[str, Any]:
+    """Everything but the timestamp, which the caller fills in. `raw` is normalized."""
+    raw_lower = raw.lower()
+    # Only the first 80 chars can end up in the title, so never split the
+    # whole (possibly huge) description into lines
+    title = raw[:80].splitlines()[0] if raw else "Untitled incident"
 
     matched_keywords: Dict[str, List[str]] = {}
     reasoning: List[str] = []
 
-    category, cat_matches, suspected, cat_conf, cat_reason = _classify_category(raw)
-    matched_keywords["category"] = cat_matches
-    reasoning.extend(cat_reason)
-
-    urgency, urg_matches, urg_conf, urg_reason = _classify_urgency(raw)
-    matched_keywords["urgency"] = urg_matches
-    reasoning.extend(urg_reason)
+    # Classifiers append to these directly (in this order)
+    category, suspected, cat_conf = _classify_category(raw_lower, reasoning, matched_keywords)
+    urgency, urg_conf = _classify_urgency(raw_lower, reasoning, matched_keywords)
+    impact = _infer_impact(raw_lower, reasoning, matched_keywords)
 
-    impact, impact_matches, impact_reason = _infer_impact(raw)
-    if impact_matches:
-        matched_keywords["impact"] = impact_matches
-    reasoning.extend(impact_reason)
-
-    questions = _missing_info_questions(raw)
+    questions = _missing_info_questions(raw_lower)
 
     # Combine confidence signals (simple weighted average)
     confidence = round((0.55 * cat_conf) + (0.35 * urg_conf) + (0.10 * (0.75 if impact != "Unknown/unclear impact" else 0.45)), 2)
 
     # Human review
     needs_review = False
-    if category == Category.GENERAL_OPS and confidence < 0.55:
+    if category == _CAT_GENERAL_OPS and confidence < 0.55:
         needs_review = True
         reasoning.append("Low confidence category; recommend human review.")
-    if urgency == Urgency.HIGH and "error" not in raw.lower() and "log" not in raw.lower():
+    if urgency == _URG_HIGH and "error" not in raw_lower and "log" not in raw_lower:
         needs_review = True
         reasoning.append("High urgency without supporting error/log details; recommend human review.")
     if len(questions) >= 3:
         needs_review = True
         reasoning.append("Multiple missing critical fields; recommend collecting info before actioning.")
 
-    next_actions = ACTION_PLAYBOOK.get(category, ACTION_PLAYBOOK[Category.GENERAL_OPS]).copy()
-
-    # RAG hooks: suggest runbook types (IDs/names), but don't invent content
-    recommended_runbooks = []
-    if category == Category.IT_OPS and "Authentication" in suspected:
-        recommended_runbooks = ["RBK-IT-AUTH-001", "RBK-IT-SSO-002"]
-    elif category == Category.CUSTOMER_SUPPORT:
-        recommended_runbooks = ["RBK-CS-PAYMENTS-010"]
-    elif category == Category.ENGINEERING:
-        recommended_runbooks = ["RBK-ENG-CICD-101"]
-    elif category == Category.OPERATIONS:
-        recommended_runbooks = ["RBK-OPS-LOGISTICS-050"]
-
-    ticket = IncidentTicket(
-        ticket_id=_simple_ticket_id(raw),
-        created_at_utc=_utc_now_iso(),
-        title=title,
-        description=raw,
-        category=category,
-        urgency=urgency,
-        impact=impact,
-        suspected_systems=suspected,
-
-        matched_keywords=matched_keywords,
-        reasoning=reasoning,
-        confidence=confidence,
-
-        needs_human_review=needs_review,
-        missing_info_questions=questions,
-        next_actions=next_actions,
-
-        recommended_runbooks=recommended_runbooks,
-        citations=[],
-    )
-
-    return asdict(ticket)
+    # Tickets get their own lists, never the module-level tuples
+    next_actions = list(ACTION_PLAYBOOK.get(category, ACTION_PLAYBOOK[_CAT_GENERAL_OPS]))
+
+    recommended_runbooks = list(RUNBOOKS.get(category, ()))
+
+    # Same keys/order as the IncidentTicket fields, without the dataclass round-trip
+    return {
+        "ticket_id": _simple_ticket_id(raw),
+        "created_at_utc": None,  # set per call by _triage
+        "title": title,
+        "description": raw,
+        "category": category,
+        "urgency": urgency,
+        "impact": impact,
+        "suspected_systems": list(suspected),
+
+        "matched_keywords": matched_keywords,
+        "reasoning": reasoning,
+        "confidence": confidence,
+
+        "needs_human_review": needs_review,
+        "missing_info_questions": questions,
+        "next_actions": next_actions,
+
+        "recommended_runbooks": recommended_runbooks,
+        "citations": [],
+    }
+
 
+_build_ticket_cached = lru_cache(maxsize=4096)(_build_ticket)